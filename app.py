@@ -1,9 +1,23 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from model.sweet_model import add_sweet, get_sweets, remove_sweet, get_sweet_by_id
-from model.order_model import place_order, get_orders, get_daily_summary, update_order_status, edit_order
+from model.order_model import place_order, iter_orders, get_daily_summary, update_order_status, bulk_update_status, edit_order
+
+try:
+    import orjson
+except ImportError:  # fall back to Flask's stdlib json encoder
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Encode responses with orjson; anything it can't handle natively (ObjectId) is stringified."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=str).decode("utf-8")
 
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 
 # Configure CORS to handle large responses with base64 images
 CORS(app, resources={
@@ -207,12 +221,31 @@ def admin_remove_sweet():
     except Exception as e:
         return jsonify({"error": f"Failed to remove sweet: {str(e)}"}), 500
 
+def _stream_json_array(first, rest):
+    """Encode an iterable as a JSON array chunk by chunk."""
+    yield "["
+    yield app.json.dumps(first)
+    for item in rest:
+        yield ","
+        yield app.json.dumps(item)
+    yield "]"
+
 @app.route("/admin/orders", methods=["GET"])
 def admin_orders():
-    """Get all orders with optional delivery date filtering."""
+    """Get all orders with optional delivery date filtering.
+    Accepts ?fields=customerName,total,... to return only those fields.
+    The response is streamed so large order lists are never held in memory at once.
+    """
+    fields = [f.strip() for f in request.args.get("fields", "").split(",") if f.strip()]
     try:
-        orders = get_orders()
-        return jsonify(orders)
+        # Pull the first order eagerly so query errors still produce a 500
+        orders = iter_orders(fields or None)
+        first = next(orders, None)
+        if first is None:
+            return jsonify([])
+        return Response(_stream_json_array(first, orders), mimetype="application/json")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": f"Failed to fetch orders: {str(e)}"}), 500
 
@@ -225,8 +258,26 @@ def admin_summary():
     except Exception as e:
         return jsonify({"error": f"Failed to fetch daily summary: {str(e)}"}), 500
 
+@app.route("/admin/daily_summary/stats", methods=["GET"])
+def admin_summary_stats():
+    """Get daily sales totals without the list of today's orders."""
+    try:
+        summary = get_daily_summary(include_orders=False)
+        return jsonify(summary)
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch daily summary: {str(e)}"}), 500
+
 # ----- ORDER ADMIN UPDATES -----
 
+def _normalize_status(raw_status):
+    """Map a raw status value to Delivered/Cancelled, or None if not allowed."""
+    status_lc = str(raw_status).strip().lower()
+    if status_lc == "delivered":
+        return "Delivered"
+    if status_lc == "cancelled":
+        return "Cancelled"
+    return None
+
 @app.route("/admin/update_order_status", methods=["PUT"])
 def admin_update_order_status():
     """Update status of an order by orderId."""
@@ -248,10 +299,9 @@ def admin_update_order_status():
     if not order_id or not raw_status:
         return jsonify({"error": "Missing required fields: orderId and status"}), 400
 
-    status_lc = str(raw_status).strip().lower()
-    if status_lc not in ("delivered", "cancelled"):
+    status = _normalize_status(raw_status)
+    if status is None:
         return jsonify({"error": "Invalid status. Allowed values: Delivered or Cancelled"}), 400
-    status = "Delivered" if status_lc == "delivered" else "Cancelled"
 
     try:
         updated = update_order_status(order_id, status)
@@ -263,6 +313,27 @@ def admin_update_order_status():
         return jsonify({"error": f"Failed to update order status: {str(e)}"}), 500
 
 
+@app.route("/admin/bulk_update_status", methods=["PUT"])
+def admin_bulk_update_status():
+    """Update the status of several orders given as orderIds."""
+    data = request.get_json(silent=True) or {}
+    order_ids = data.get("orderIds")
+    raw_status = data.get("status")
+
+    if not isinstance(order_ids, list) or not order_ids or not raw_status:
+        return jsonify({"error": "Missing required fields: orderIds (list) and status"}), 400
+
+    status = _normalize_status(raw_status)
+    if status is None:
+        return jsonify({"error": "Invalid status. Allowed values: Delivered or Cancelled"}), 400
+
+    try:
+        updated = bulk_update_status(order_ids, status)
+        return jsonify({"message": f"{updated} order(s) marked as {status}", "updated": updated}), 200
+    except Exception as e:
+        return jsonify({"error": f"Failed to update order status: {str(e)}"}), 500
+
+
 @app.route("/admin/edit_order/<order_id>", methods=["PUT"])
 def admin_edit_order(order_id):
     """Edit fields of an order by ID. Only provided fields are updated."""
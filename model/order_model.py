@@ -1,9 +1,24 @@
-from pymongo import MongoClient, ReturnDocument
+import pymongo
+from pymongo import MongoClient, ReturnDocument, UpdateOne, WriteConcern
+from pymongo.errors import PyMongoError
 from bson import ObjectId
 import os
 from dotenv import load_dotenv
 from datetime import datetime, date
-import ssl
+from concurrent.futures import ProcessPoolExecutor
+import atexit
+import copy
+import functools
+import json
+import multiprocessing
+import queue
+import threading
+import time
+
+try:
+    import redis
+except ImportError:  # Redis caching is optional
+    redis = None
 
 load_dotenv()
 
@@ -34,49 +49,196 @@ def validate_dates(order_date_str, delivery_date_str):
     
     return True, None
 
+_today_cache = {"ts": None, "value": None}
+
+def _today_str():
+    """Return today's date as YYYY-MM-DD, reformatted at most once per second."""
+    ts = int(time.time())
+    if _today_cache["ts"] != ts:
+        _today_cache["value"] = datetime.now().strftime("%Y-%m-%d")
+        _today_cache["ts"] = ts
+    return _today_cache["value"]
+
 MONGO_URI = os.getenv("MONGO_URI")
 if not MONGO_URI:
     # Fallback to local Mongo for development so endpoints don't 500 when env is missing
     MONGO_URI = "mongodb://127.0.0.1:27017"
     print("⚠️ MONGO_URI not set; falling back to local MongoDB at mongodb://127.0.0.1:27017")
 
-# Force legacy OpenSSL provider for compatibility with MongoDB Atlas
-os.environ['OPENSSL_CONF'] = ''
-
-# Create SSL context with legacy settings
-ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-ssl_context.check_hostname = False
-ssl_context.verify_mode = ssl.CERT_NONE
-ssl_context.options |= 0x4  # OP_LEGACY_SERVER_CONNECT
+# MongoDB connection settings with safer TLS handling
+mongo_kwargs = {
+    "serverSelectionTimeoutMS": 30000,
+    # Connection pool tuned for a few gunicorn workers sharing one cluster
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL", "50")),
+    "minPoolSize": 5,
+    "maxIdleTimeMS": 60000,
+    "waitQueueTimeoutMS": 2000,
+    "retryWrites": True,
+    # Wire compression, negotiated with the server; zlib is the stdlib fallback
+    "compressors": os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib"),
+    "zlibCompressionLevel": -1,
+}
+# Enable TLS only for SRV (Atlas) URIs or when explicitly provided in URI
+if MONGO_URI.startswith("mongodb+srv://"):
+    mongo_kwargs["tls"] = True
+    # Optionally allow invalid certs via env toggle (default False)
+    if os.getenv("MONGO_TLS_ALLOW_INVALID", "false").lower() in ("1", "true", "yes"):
+        mongo_kwargs["tlsAllowInvalidCertificates"] = True
+
+@functools.lru_cache(maxsize=1)
+def _get_client():
+    """Create the MongoClient on first use, so each gunicorn worker builds its own after fork.
+    connect=False defers the handshake to the first operation. Returns None if the client
+    cannot be created.
+    """
+    try:
+        return MongoClient(MONGO_URI, connect=False, **mongo_kwargs)
+    except Exception as e:
+        print(f"⚠️ MongoDB connection error: {e}")
+        return None
 
-# MongoDB connection with safer TLS handling
-try:
-    mongo_kwargs = {
-        "serverSelectionTimeoutMS": 30000,
-    }
-    # Enable TLS only for SRV (Atlas) URIs or when explicitly provided in URI
-    if MONGO_URI.startswith("mongodb+srv://"):
-        mongo_kwargs["tls"] = True
-        # Optionally allow invalid certs via env toggle (default False)
-        if os.getenv("MONGO_TLS_ALLOW_INVALID", "false").lower() in ("1", "true", "yes"):
-            mongo_kwargs["tlsAllowInvalidCertificates"] = True
-
-    client = MongoClient(MONGO_URI, **mongo_kwargs)
-    # Test the connection
-    client.admin.command('ping')
+# Cached readiness check, so an unreachable database gives fast "not connected"
+# responses instead of every request waiting out serverSelectionTimeoutMS.
+# The first ping may include SRV lookup and the TLS handshake, so allow a few seconds.
+MONGO_READY_TIMEOUT = float(os.getenv("MONGO_READY_TIMEOUT", "10"))
+# Seconds to wait before pinging again after a failure (0 = retry on the next request)
+MONGO_READY_RECHECK = float(os.getenv("MONGO_READY_RECHECK", "0"))
+# Seconds between attempts to create indexes after a failure
+INDEX_RETRY_INTERVAL = 60
+_db_ready = {"ok": False, "checked": 0.0, "indexes": None, "index_attempt": 0.0}
+_db_ready_lock = threading.Lock()
+
+def _ensure_indexes(client):
+    # Index the daily summary path: filter on orderDate, newest first by createdAt
+    try:
+        client["sweet_store"]["orders"].create_index([("orderDate", 1), ("createdAt", -1)])
+    except PyMongoError as e:
+        print(f"⚠️ Could not create order indexes (will retry): {e}")
+        _db_ready["indexes"] = None
+        return
+    _db_ready["indexes"] = "done"
+
+def _maybe_ensure_indexes(client):
+    """Create indexes on a background thread, retrying failures every INDEX_RETRY_INTERVAL seconds."""
+    if _db_ready["indexes"] is not None:
+        return
+    with _db_ready_lock:
+        if _db_ready["indexes"] is not None:
+            return
+        if _db_ready["index_attempt"] and time.monotonic() - _db_ready["index_attempt"] < INDEX_RETRY_INTERVAL:
+            return
+        _db_ready["indexes"] = "running"
+        _db_ready["index_attempt"] = time.monotonic()
+    threading.Thread(target=_ensure_indexes, args=(client,), name="order-indexes", daemon=True).start()
+
+def _db_is_ready(client):
+    """Ping the server (bounded by MONGO_READY_TIMEOUT) until it answers once.
+    After a failure the ping is retried after MONGO_READY_RECHECK seconds (by default on
+    the next request). Once connected, later outages surface as errors from the
+    operations themselves rather than as empty responses.
+    """
+    if _db_ready["ok"]:
+        return True
+    with _db_ready_lock:
+        if _db_ready["ok"]:
+            return True
+        if _db_ready["checked"] and time.monotonic() - _db_ready["checked"] < MONGO_READY_RECHECK:
+            return False
+        _db_ready["checked"] = time.monotonic()
+        try:
+            with pymongo.timeout(MONGO_READY_TIMEOUT):
+                client.admin.command("ping")
+        except PyMongoError as e:
+            print(f"⚠️ MongoDB not reachable ({e}); serving degraded empty responses until it is")
+            return False
+        _db_ready["ok"] = True
     print("✅ MongoDB connection successful!")
-except Exception as e:
-    print(f"⚠️ MongoDB connection error: {e}")
-    client = None
+    return True
 
-db = client["sweet_store"] if client is not None else None
-order_collection = db["orders"] if db is not None else None
+def _order_collection():
+    """Return the orders collection, or None if the database is unavailable."""
+    client = _get_client()
+    if client is None or not _db_is_ready(client):
+        return None
+    # Build indexes off the request path
+    _maybe_ensure_indexes(client)
+    return client["sweet_store"]["orders"]
+
+# Short-lived cache for get_daily_summary, one entry per include_orders value so the
+# full and stats-only summaries don't evict each other; writes clear it
+SUMMARY_CACHE_TTL = 15
+_summary_cache = {}
+
+# Optional shared Redis cache for order reads, keyed by a write epoch
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS_CACHE_TTL = 30
+# Order listings longer than this are streamed but not cached
+REDIS_MAX_CACHED_ORDERS = int(os.getenv("REDIS_MAX_CACHED_ORDERS", "500"))
+_EPOCH_KEY = "orders:epoch"
+redis_client = None
+if REDIS_URL and redis is not None:
+    redis_client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+elif REDIS_URL:
+    print("⚠️ REDIS_URL set but the redis package is not installed; Redis caching disabled")
+
+def _cache_get(key):
+    """Return the cached value for key, or None on a miss or Redis error."""
+    if redis_client is None:
+        return None
+    try:
+        data = redis_client.get(key)
+    except redis.RedisError as e:
+        print(f"⚠️ Redis read failed: {e}")
+        return None
+    return json.loads(data) if data is not None else None
 
-def place_order(order):
-    """Place a new order in the database with delivery date support."""
-    if order_collection is None:
-        raise RuntimeError("Database not connected: cannot place order")
-    
+def _cache_set(key, value):
+    if redis_client is None:
+        return
+    try:
+        redis_client.setex(key, REDIS_CACHE_TTL, json.dumps(value, default=str))
+    except redis.RedisError as e:
+        print(f"⚠️ Redis write failed: {e}")
+
+def _cache_epoch():
+    """Current write epoch; bumping it makes every cached read key stale."""
+    if redis_client is None:
+        return None
+    try:
+        return redis_client.get(_EPOCH_KEY) or "0"
+    except redis.RedisError as e:
+        print(f"⚠️ Redis read failed: {e}")
+        return None
+
+def _invalidate_caches():
+    _summary_cache.clear()
+    if redis_client is not None:
+        try:
+            redis_client.incr(_EPOCH_KEY)
+        except redis.RedisError as e:
+            print(f"⚠️ Redis epoch bump failed: {e}")
+
+def _to_num(value, default=0.0):
+    """Coerce a value to float, returning default if it is not numeric.
+    Falsy values ("", None, 0, []) always map to 0.0 regardless of default, so a blank
+    quantity fails the ">= 1" check rather than being reported as invalid.
+    Values that are already numbers skip the try/except path.
+    """
+    if isinstance(value, float):
+        return value
+    if isinstance(value, int):
+        return float(value)
+    if not value:
+        return 0.0
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return default
+
+def _normalize_order(order):
+    """Validate an order in place and coerce its numeric fields.
+    Raises ValueError if dates or item quantities are invalid.
+    """
     # Validate required date fields
     if "orderDate" not in order or not order["orderDate"]:
         raise ValueError("Order date is required")
@@ -96,11 +258,8 @@ def place_order(order):
     order["deliveryDate"] = order["deliveryDate"]
     
     # Ensure numeric fields are stored as numbers
-    try:
-        if "total" in order:
-            order["total"] = float(order.get("total", 0) or 0)
-    except (ValueError, TypeError):
-        order["total"] = 0
+    if "total" in order:
+        order["total"] = _to_num(order["total"])
 
     # Validate and coerce item prices and quantities to numeric types
     for item in order.get("items", []) or []:
@@ -108,21 +267,15 @@ def place_order(order):
         if "quantity" not in item:
             raise ValueError(f"Quantity is required for item: {item.get('sweetName', 'Unknown')}")
         
-        try:
-            quantity = float(item.get("quantity", 0) or 0)
-            if quantity < 1:
-                raise ValueError(f"Quantity must be at least 1 for item: {item.get('sweetName', 'Unknown')}")
-            item["quantity"] = quantity
-        except (ValueError, TypeError) as e:
-            if "must be at least 1" in str(e):
-                raise
+        quantity = _to_num(item["quantity"], default=None)
+        if quantity is None:
             raise ValueError(f"Invalid quantity for item: {item.get('sweetName', 'Unknown')}")
-        
-        try:
-            if "price" in item:
-                item["price"] = float(item.get("price", 0) or 0)
-        except (ValueError, TypeError):
-            item["price"] = 0
+        if quantity < 1:
+            raise ValueError(f"Quantity must be at least 1 for item: {item.get('sweetName', 'Unknown')}")
+        item["quantity"] = quantity
+
+        if "price" in item:
+            item["price"] = _to_num(item["price"])
         
         # Store unit field (default to 'kg' if not provided)
         unit = item.get("unit", "kg").strip().lower()
@@ -130,47 +283,231 @@ def place_order(order):
             unit = "kg"
         item["unit"] = unit
 
+    return order
+
+# Optional process pool for best-effort order inserts (0 = insert on the request thread)
+ORDER_WRITE_WORKERS = int(os.getenv("ORDER_WRITE_WORKERS", "0"))
+_write_pool = None
+_write_pool_lock = threading.Lock()
+
+def _get_write_pool():
+    global _write_pool
+    with _write_pool_lock:
+        if _write_pool is None:
+            # spawn, not fork: the parent already runs MongoClient monitor threads,
+            # and forking a multi-threaded process can deadlock the child
+            _write_pool = ProcessPoolExecutor(
+                max_workers=ORDER_WRITE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+    return _write_pool
+
+def _do_insert(order):
+    """Insert an order from a write-pool process using that process's own client."""
+    client = _get_client()
+    if client is None:
+        raise RuntimeError("Database not connected: cannot place order")
+    client["sweet_store"]["orders"].insert_one(order)
+
+def _on_insert_done(future):
+    _invalidate_caches()
+    error = future.exception()
+    if error is not None:
+        print(f"⚠️ Background order insert failed: {error}")
+
+# Optional write buffer: a background thread flushes queued orders with insert_many
+# once ORDER_WRITE_BATCH_SIZE orders are queued or ORDER_WRITE_FLUSH_MS has passed (0 = disabled)
+ORDER_WRITE_BATCH_SIZE = int(os.getenv("ORDER_WRITE_BATCH_SIZE", "0"))
+ORDER_WRITE_FLUSH_MS = int(os.getenv("ORDER_WRITE_FLUSH_MS", "50"))
+_write_q = queue.Queue()
+_FLUSH_STOP = object()  # queued by the atexit hook to make the flusher finish up
+_flusher = None
+_flusher_lock = threading.Lock()
+
+def _drain_batch(q, max_items, timeout):
+    """Block for one item, then take up to max_items until timeout seconds have passed.
+    Returns (batch, stop) where stop is True once the _FLUSH_STOP sentinel was seen.
+    """
+    first = q.get()
+    if first is _FLUSH_STOP:
+        return [], True
+    batch = [first]
+    deadline = time.monotonic() + timeout
+    while len(batch) < max_items:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            item = q.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if item is _FLUSH_STOP:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+def _insert_batch(batch):
+    try:
+        _order_collection().insert_many(batch, ordered=False)
+    except Exception as e:  # keep the flusher thread alive
+        print(f"⚠️ Buffered order insert failed: {e}")
+    _invalidate_caches()
+
+def _flush_loop():
+    while True:
+        batch, stop = _drain_batch(_write_q, ORDER_WRITE_BATCH_SIZE, ORDER_WRITE_FLUSH_MS / 1000)
+        if stop:
+            # Anything queued after the sentinel still gets written
+            while True:
+                try:
+                    item = _write_q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _FLUSH_STOP:
+                    batch.append(item)
+        if batch:
+            _insert_batch(batch)
+        if stop:
+            return
+
+def _stop_flusher():
+    """At exit, let the flusher write its in-flight batch and the rest of the queue."""
+    _write_q.put(_FLUSH_STOP)
+    _flusher.join()
+
+def _ensure_flusher():
+    global _flusher
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name="order-write-flusher", daemon=True)
+            _flusher.start()
+            atexit.register(_stop_flusher)
+
+def place_order(order):
+    """Place a new order in the database with delivery date support.
+    When ORDER_WRITE_BATCH_SIZE > 0 the order is queued for a batched insert;
+    otherwise, when ORDER_WRITE_WORKERS > 0 the insert is handed to a process pool.
+    In both modes this returns once the order is validated (best effort, errors are logged).
+    """
+    order_collection = _order_collection()
+    if order_collection is None:
+        raise RuntimeError("Database not connected: cannot place order")
+    _normalize_order(order)
+    if ORDER_WRITE_BATCH_SIZE > 0:
+        _ensure_flusher()
+        _write_q.put(order)
+        return
+    if ORDER_WRITE_WORKERS > 0:
+        _get_write_pool().submit(_do_insert, order).add_done_callback(_on_insert_done)
+        return
     order_collection.insert_one(order)
+    _invalidate_caches()
 
-def _serialize_datetimes(doc):
-    """Convert datetime objects in a document to strings to make them JSON-serializable."""
-    if not doc:
-        return doc
-    if isinstance(doc.get("createdAt"), datetime):
-        doc["createdAt"] = doc["createdAt"].strftime("%Y-%m-%d %H:%M:%S")
-    if isinstance(doc.get("updatedAt"), datetime):
-        doc["updatedAt"] = doc["updatedAt"].strftime("%Y-%m-%d %H:%M:%S")
-    # orderDate and deliveryDate are already strings
-    return doc
+def place_order_fast(order):
+    """Place an order with a relaxed write concern (w=1, no journal wait).
+    For non-critical writes such as analytics mirrors; a primary failover can lose the order.
+    """
+    order_collection = _order_collection()
+    if order_collection is None:
+        raise RuntimeError("Database not connected: cannot place order")
+    _normalize_order(order)
+    fast_collection = order_collection.with_options(write_concern=WriteConcern(w=1, j=False))
+    fast_collection.insert_one(order, bypass_document_validation=True)
+    _invalidate_caches()
+
+def place_orders_bulk(orders: list):
+    """Place several orders in a single round-trip.
+    All orders are validated before anything is written; returns the number inserted.
+    On a partial failure the BulkWriteError propagates; its details["nInserted"]
+    holds how many orders were written.
+    """
+    order_collection = _order_collection()
+    if order_collection is None:
+        raise RuntimeError("Database not connected: cannot place orders")
+    if not orders:
+        return 0
+    for order in orders:
+        _normalize_order(order)
+    try:
+        result = order_collection.insert_many(orders, ordered=False)
+    finally:
+        # Some orders may be written even when insert_many raises
+        _invalidate_caches()
+    return len(result.inserted_ids)
 
 def _serialize_order(doc):
     """Normalize an order document for API responses (stringify _id and datetimes).
     Also ensures legacy orders have quantity and unit defaulted for each item.
+    The document is modified in place; callers pass fresh documents from pymongo.
     """
     if not doc:
         return None
-    doc = dict(doc)
     if doc.get("_id") is not None:
         doc["_id"] = str(doc["_id"])
-    
+
+    # Convert datetimes to strings to make them JSON-serializable
+    # (orderDate and deliveryDate are already strings)
+    for key in ("createdAt", "updatedAt"):
+        value = doc.get(key)
+        if isinstance(value, datetime):
+            doc[key] = value.isoformat(sep=" ", timespec="seconds")
+
     # Handle legacy orders: ensure all items have quantity and unit fields
-    if "items" in doc and isinstance(doc["items"], list):
-        for item in doc["items"]:
+    items = doc.get("items")
+    if isinstance(items, list):
+        for item in items:
             if isinstance(item, dict):
                 if "quantity" not in item:
                     item["quantity"] = 1
                 if "unit" not in item:
                     item["unit"] = "kg"  # Default to 'kg' for backward compatibility
-    
-    return _serialize_datetimes(doc)
 
-def get_orders():
-    """Retrieve all orders, sorted by delivery date (ascending), including _id as string.
+    return doc
+
+def _to_double(field):
+    """Build an aggregation expression that coerces a field to a double.
+    Missing, null or non-numeric values count as 0, matching the old Python fold.
+    """
+    return {"$convert": {"input": field, "to": "double", "onError": 0, "onNull": 0}}
+
+# Fields returned to the admin UI after an order is updated
+ORDER_PROJECTION = {"_id": 1, "customerName": 1, "mobile": 1, "address": 1, "status": 1, "total": 1, "orderDate": 1, "deliveryDate": 1, "preference": 1, "createdAt": 1, "updatedAt": 1, "items": 1}
+
+# Cursor batch size for order listings; fewer getMore round-trips on large lists
+ORDERS_BATCH_SIZE = 500
+
+def _first_non_empty(field, fallback, default):
+    """Build an aggregation expression for `field or fallback or default`.
+    Null, missing and empty-string values fall through, like Python's `or`.
+    """
+    def is_empty(expr):
+        return {"$eq": [{"$ifNull": [expr, ""]}, ""]}
+    return {
+        "$cond": [
+            is_empty(field),
+            {"$cond": [is_empty(fallback), default, fallback]},
+            field,
+        ]
+    }
+
+def _validate_fields(fields):
+    """Raise ValueError unless every requested field is a known top-level order field."""
+    unknown = [field for field in fields if field not in ORDER_PROJECTION]
+    if unknown:
+        raise ValueError(f"Unknown order field(s): {', '.join(unknown)}")
+
+def iter_orders(fields=None, batch_size=ORDERS_BATCH_SIZE):
+    """Yield orders one at a time, sorted by delivery date (ascending), including _id as string.
     Orders without deliveryDate will be sorted to the end.
+    If fields is given, only those fields (plus _id) are returned;
+    raises ValueError if any of them is not in ORDER_PROJECTION.
     """
+    if fields:
+        _validate_fields(fields)
+    order_collection = _order_collection()
     if order_collection is None:
         print("⚠️ Database not connected; returning empty orders list")
-        return []
+        return
     # Sort by deliveryDate ascending (1), nulls last
     # MongoDB sorts null/missing values first, so we need a pipeline to handle this
     pipeline = [
@@ -184,11 +521,63 @@ def get_orders():
         {"$sort": {"deliveryDateSort": 1}},
         {"$project": {"deliveryDateSort": 0}}
     ]
-    docs = list(order_collection.aggregate(pipeline))
-    return [_serialize_order(d) for d in docs]
-
-def get_daily_summary():
-    """Get summary statistics for today's orders."""
+    if fields:
+        pipeline[-1] = {"$project": {field: 1 for field in fields}}
+
+    epoch = _cache_epoch()
+    cache_key = f"orders:{epoch}:{','.join(fields or [])}"
+    if epoch is not None:
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            yield from cached
+            return
+
+    # Collect the orders only when there is somewhere to cache them, and give up
+    # once the list is too large so streaming stays O(batch_size) in memory
+    collected = [] if epoch is not None else None
+    for d in order_collection.aggregate(pipeline, batchSize=batch_size):
+        order = _serialize_order(d)
+        if collected is not None:
+            collected.append(order)
+            if len(collected) > REDIS_MAX_CACHED_ORDERS:
+                collected = None
+        yield order
+    if collected is not None:
+        _cache_set(cache_key, collected)
+
+def get_orders(fields=None):
+    """Retrieve all orders as a list; see iter_orders."""
+    return list(iter_orders(fields))
+
+def get_orders_by_ids(order_ids):
+    """Fetch several orders with one $in query, preserving the order of order_ids.
+    Ids that are invalid or not found map to None.
+    """
+    order_collection = _order_collection()
+    if order_collection is None:
+        print("⚠️ Database not connected; returning empty orders list")
+        return [None for _ in order_ids]
+    oids = []
+    for order_id in order_ids:
+        try:
+            oids.append(ObjectId(order_id))
+        except Exception:
+            oids.append(None)
+    by_id = {}
+    valid = [oid for oid in oids if oid is not None]
+    if valid:
+        for d in order_collection.find({"_id": {"$in": valid}}):
+            # Key by ObjectId (read before _serialize_order stringifies it)
+            # so ids given in uppercase hex still match
+            oid = d["_id"]
+            by_id[oid] = _serialize_order(d)
+    return [by_id.get(oid) if oid is not None else None for oid in oids]
+
+def get_daily_summary(include_orders=True):
+    """Get summary statistics for today's orders.
+    Totals are computed server-side; pass include_orders=False to skip the order list.
+    """
+    order_collection = _order_collection()
     if order_collection is None:
         print("⚠️ Database not connected; returning empty daily summary")
         return {
@@ -199,58 +588,91 @@ def get_daily_summary():
             "orders": []
         }
 
-    today = datetime.now().strftime("%Y-%m-%d")
-    today_orders = list(order_collection.find({"orderDate": today}, {"_id": 0}).sort("createdAt", -1))
-
-    total_orders = len(today_orders)
-    total_revenue = 0
-    for order in today_orders:
-        try:
-            total_revenue += float(order.get("total", 0) or 0)
-        except (ValueError, TypeError):
-            continue
-
-    total_items_sold = 0
-    sweet_stats = {}
-
-    for order in today_orders:
-        for item in order.get("items", []) or []:
-            try:
-                quantity_ordered = float(item.get("quantity", 0) or 0)
-            except (ValueError, TypeError):
-                quantity_ordered = 0
-
-            sweet_name = item.get("sweetName") or item.get("name") or "Unknown"
-
-            try:
-                price = float(item.get("price", 0) or 0)
-            except (ValueError, TypeError):
-                price = 0
-
-            total_items_sold += quantity_ordered
+    today = _today_str()
+    # Include the Redis write epoch so writes from other workers invalidate this cache too
+    epoch = _cache_epoch()
+    cache_key = (today, epoch)
+    entry = _summary_cache.get(include_orders)
+    if entry and entry["key"] == cache_key and time.monotonic() < entry["exp"]:
+        return copy.deepcopy(entry["value"])
 
-            if sweet_name not in sweet_stats:
-                sweet_stats[sweet_name] = {"name": sweet_name, "quantity": 0, "revenue": 0}
+    redis_key = f"summary:{epoch}:{today}:{int(include_orders)}"
+    if epoch is not None:
+        cached = _cache_get(redis_key)
+        if cached is not None:
+            return cached
 
-            sweet_stats[sweet_name]["quantity"] += quantity_ordered
-            sweet_stats[sweet_name]["revenue"] += quantity_ordered * price
-
-    popular_sweets = sorted(sweet_stats.values(), key=lambda x: x["quantity"], reverse=True)
+    pipeline = [
+        {"$match": {"orderDate": today}},
+        {
+            "$facet": {
+                "totals": [
+                    {
+                        "$group": {
+                            "_id": None,
+                            "total_orders": {"$sum": 1},
+                            "total_revenue": {"$sum": _to_double("$total")},
+                        }
+                    }
+                ],
+                "popular": [
+                    {"$unwind": "$items"},
+                    {
+                        "$group": {
+                            "_id": _first_non_empty("$items.sweetName", "$items.name", "Unknown"),
+                            "quantity": {"$sum": _to_double("$items.quantity")},
+                            "revenue": {
+                                "$sum": {
+                                    "$multiply": [
+                                        _to_double("$items.quantity"),
+                                        _to_double("$items.price"),
+                                    ]
+                                }
+                            },
+                        }
+                    },
+                    {"$sort": {"quantity": -1}},
+                    {"$limit": 5},
+                    {"$project": {"_id": 0, "name": "$_id", "quantity": 1, "revenue": 1}},
+                ],
+                "items_sold": [
+                    {"$unwind": "$items"},
+                    {"$group": {"_id": None, "q": {"$sum": _to_double("$items.quantity")}}},
+                ],
+            }
+        },
+    ]
+    result = next(order_collection.aggregate(pipeline), {})
 
-    serialized_orders = [_serialize_order(o) for o in today_orders]
+    totals = (result.get("totals") or [{}])[0]
+    items_sold = (result.get("items_sold") or [{}])[0]
 
-    return {
-        "total_orders": total_orders,
-        "total_revenue": total_revenue,
-        "total_items_sold": total_items_sold,
-        "popular_sweets": popular_sweets[:5],
-        "orders": serialized_orders
+    summary = {
+        "total_orders": totals.get("total_orders", 0),
+        "total_revenue": totals.get("total_revenue", 0),
+        "total_items_sold": items_sold.get("q", 0),
+        "popular_sweets": result.get("popular", []),
     }
+    if include_orders:
+        # Fetched with a plain cursor: a $facet output is one document capped at 16 MiB,
+        # and this query can use the orderDate/createdAt index
+        today_orders = order_collection.find({"orderDate": today}, {"_id": 0}).sort("createdAt", -1)
+        summary["orders"] = [_serialize_order(o) for o in today_orders]
+
+    _summary_cache[include_orders] = {
+        "key": cache_key,
+        "value": summary,
+        "exp": time.monotonic() + SUMMARY_CACHE_TTL,
+    }
+    if epoch is not None:
+        _cache_set(redis_key, summary)
+    return copy.deepcopy(summary)
 
 def update_order_status(order_id: str, status: str):
     """Update the status of an order and return the updated document.
     Returns None if order not found.
     """
+    order_collection = _order_collection()
     if order_collection is None:
         raise RuntimeError("Database not connected: cannot update order status")
     try:
@@ -262,18 +684,101 @@ def update_order_status(order_id: str, status: str):
         {"_id": oid},
         {"$set": {"status": status, "updatedAt": datetime.now()}},
         return_document=ReturnDocument.AFTER,
-        projection={"_id": 1, "customerName": 1, "mobile": 1, "address": 1, "status": 1, "total": 1, "orderDate": 1, "deliveryDate": 1, "createdAt": 1, "updatedAt": 1, "items": 1}
+        projection=ORDER_PROJECTION
     )
     if not updated:
         return None
+    _invalidate_caches()
     return _serialize_order(updated)
 
+def bulk_update_status(order_ids, status: str):
+    """Set the status of several orders in one round-trip.
+    Invalid ids are skipped. Returns the number of orders matched.
+    On a partial failure the BulkWriteError propagates; its details["nModified"]
+    holds how many orders were updated.
+    """
+    order_collection = _order_collection()
+    if order_collection is None:
+        raise RuntimeError("Database not connected: cannot update order status")
+    now = datetime.now()
+    ops = []
+    for order_id in order_ids or []:
+        try:
+            oid = ObjectId(order_id)
+        except Exception:
+            continue
+        ops.append(UpdateOne({"_id": oid}, {"$set": {"status": status, "updatedAt": now}}))
+    if not ops:
+        return 0
+    try:
+        result = order_collection.bulk_write(ops, ordered=False)
+    finally:
+        # Some updates may be applied even when bulk_write raises
+        _invalidate_caches()
+    return result.matched_count
+
+def _identity(value):
+    return value
+
+def _coerce_items(items):
+    """Validate and coerce numeric fields inside an edited items list."""
+    if not isinstance(items, list):
+        return items
+    norm_items = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        itm = dict(item)
+
+        # Validate quantity if present (must be >= 1); default to 1 if missing or invalid
+        qty = _to_num(itm["quantity"], default=None) if "quantity" in itm else None
+        if qty is None:
+            qty = 1
+        elif qty < 1:
+            raise ValueError(f"Quantity must be at least 1 for item: {itm.get('sweetName', 'Unknown')}")
+        itm["quantity"] = qty
+
+        if "price" in itm:
+            itm["price"] = _to_num(itm["price"])
+
+        # Store unit field (default to 'kg' if not provided)
+        unit = itm.get("unit", "kg").strip().lower()
+        if unit not in ["piece", "kg"]:
+            unit = "kg"
+        itm["unit"] = unit
+
+        norm_items.append(itm)
+    return norm_items
+
+# Accepted edit_order keys mapped to the stored field name
+_EDIT_FIELD_MAP = {
+    "customerName": "customerName",
+    "contact": "mobile",
+    "amount": "total",
+    "status": "status",
+    # Allow some common fields to pass through as-is
+    "address": "address",
+    "mobile": "mobile",
+    "total": "total",
+    "orderDate": "orderDate",
+    "deliveryDate": "deliveryDate",
+    "preference": "preference",
+    "items": "items",
+}
+
+# Per-field coercion applied by edit_order; fields not listed are stored as given
+_EDIT_FIELD_COERCERS = {
+    "total": _to_num,
+    "items": _coerce_items,
+}
+
 def edit_order(order_id: str, updates: dict):
     """Update provided fields of an order and return the updated document.
     Supports field mapping: contact->mobile, amount->total.
     Validates deliveryDate if being updated.
     Returns None if order not found.
     """
+    order_collection = _order_collection()
     if order_collection is None:
         raise RuntimeError("Database not connected: cannot edit order")
     try:
@@ -284,7 +789,7 @@ def edit_order(order_id: str, updates: dict):
     # If deliveryDate is being updated, validate it against orderDate
     if "deliveryDate" in updates and updates["deliveryDate"]:
         # Fetch current order to get orderDate
-        current_order = order_collection.find_one({"_id": oid})
+        current_order = order_collection.find_one({"_id": oid}, {"orderDate": 1, "createdAt": 1})
         if not current_order:
             return None
         
@@ -294,80 +799,23 @@ def edit_order(order_id: str, updates: dict):
             if "createdAt" in current_order:
                 order_date = current_order["createdAt"].strftime("%Y-%m-%d")
             else:
-                order_date = datetime.now().strftime("%Y-%m-%d")
+                order_date = _today_str()
         
         # Validate the new delivery date
         is_valid, error_msg = validate_dates(order_date, updates["deliveryDate"])
         if not is_valid:
             raise ValueError(error_msg)
 
-    field_map = {
-        "customerName": "customerName",
-        "contact": "mobile",
-        "amount": "total",
-        "status": "status",
-        # Allow some common fields to pass through as-is
-        "address": "address",
-        "mobile": "mobile",
-        "total": "total",
-        "orderDate": "orderDate",
-        "deliveryDate": "deliveryDate",
-        "preference": "preference",
-        "items": "items",
-    }
-
     set_payload = {}
     for k, v in (updates or {}).items():
-        if k not in field_map:
+        dest = _EDIT_FIELD_MAP.get(k)
+        if dest is None:
             continue
-        dest = field_map[k]
-        if dest == "total":
-            try:
-                v = float(v or 0)
-            except (ValueError, TypeError):
-                v = 0
-        if dest == "items" and isinstance(v, list):
-            # Validate and coerce numeric fields inside items
-            norm_items = []
-            for item in v:
-                if not isinstance(item, dict):
-                    continue
-                itm = dict(item)
-                
-                # Validate quantity if present (must be >= 1)
-                try:
-                    if "quantity" in itm:
-                        qty = float(itm.get("quantity", 0) or 0)
-                        if qty < 1:
-                            raise ValueError(f"Quantity must be at least 1 for item: {itm.get('sweetName', 'Unknown')}")
-                        itm["quantity"] = qty
-                    else:
-                        # Default to 1 if not provided
-                        itm["quantity"] = 1
-                except (ValueError, TypeError) as e:
-                    if "must be at least 1" in str(e):
-                        raise
-                    itm["quantity"] = 1
-                
-                try:
-                    if "price" in itm:
-                        itm["price"] = float(itm.get("price", 0) or 0)
-                except (ValueError, TypeError):
-                    itm["price"] = 0
-                
-                # Store unit field (default to 'kg' if not provided)
-                unit = itm.get("unit", "kg").strip().lower()
-                if unit not in ["piece", "kg"]:
-                    unit = "kg"
-                itm["unit"] = unit
-                
-                norm_items.append(itm)
-            v = norm_items
-        set_payload[dest] = v
+        set_payload[dest] = _EDIT_FIELD_COERCERS.get(dest, _identity)(v)
 
     if not set_payload:
         # Nothing to update; return current doc
-        current = order_collection.find_one({"_id": oid})
+        current = order_collection.find_one({"_id": oid}, ORDER_PROJECTION)
         if not current:
             return None
         return _serialize_order(current)
@@ -377,8 +825,10 @@ def edit_order(order_id: str, updates: dict):
     updated = order_collection.find_one_and_update(
         {"_id": oid},
         {"$set": set_payload},
-        return_document=ReturnDocument.AFTER
+        return_document=ReturnDocument.AFTER,
+        projection=ORDER_PROJECTION
     )
     if not updated:
         return None
+    _invalidate_caches()
     return _serialize_order(updated)
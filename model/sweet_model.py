@@ -2,7 +2,6 @@ from pymongo import MongoClient
 from bson import ObjectId
 import os
 from dotenv import load_dotenv
-import ssl
 import re
 
 load_dotenv()
@@ -13,15 +12,6 @@ if not MONGO_URI:
     MONGO_URI = "mongodb://127.0.0.1:27017"
     print("⚠️ MONGO_URI not set; falling back to local MongoDB at mongodb://127.0.0.1:27017")
 
-# Force legacy OpenSSL provider for compatibility with MongoDB Atlas
-os.environ['OPENSSL_CONF'] = ''
-
-# Create SSL context with legacy settings
-ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-ssl_context.check_hostname = False
-ssl_context.verify_mode = ssl.CERT_NONE
-ssl_context.options |= 0x4  # OP_LEGACY_SERVER_CONNECT
-
 # MongoDB connection with safer TLS handling
 try:
     mongo_kwargs = {